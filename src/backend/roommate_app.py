@@ -3,29 +3,55 @@ Roommate Management App Backend - Flask Application
 A comprehensive backend for managing roommate life including notes, photos, chores, expenses, and more.
 """
 
-from flask import Flask, request, jsonify, send_file, session, redirect, url_for
+from flask import Flask, Response, g, request, send_file, session, redirect, stream_with_context, url_for
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 from werkzeug.utils import secure_filename
 import os
-import uuid
-import json
+import mimetypes
+import time
+import orjson
 from datetime import datetime, timedelta
 import sqlite3
+import queue
 import io
 import base64
-from PIL import Image
+from hashlib import sha1
+from PIL import Image, ImageOps
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from urllib.parse import urlencode
+from concurrent.futures import ProcessPoolExecutor
+
+# Optional: binary export encoding for clients that ask for it
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 app = Flask(__name__)
 
 # Enable CORS for all routes and origins
 CORS(app, origins=["*"], supports_credentials=True)
 
+# Compress JSON responses (brotli preferred, gzip fallback); the
+# reactions/tags/attendees-heavy lists compress 4-6x at negligible CPU cost
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 4
+# Include the streaming NDJSON export alongside regular JSON responses
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'application/x-ndjson']
+Compress(app)
+
 # Configuration
 app.config['UPLOAD_FOLDER'] = 'uploads/photos'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 app.config['DATABASE'] = 'roommate_management.db'
+# When set (e.g. '/protected-photos'), photo responses are delegated to the
+# front proxy via X-Accel-Redirect instead of being streamed by a worker.
+# Requires a matching `internal` location in the nginx config.
+app.config['ACCEL_REDIRECT_BASE'] = os.environ.get('ACCEL_REDIRECT_BASE')
 app.config['SECRET_KEY'] = 'your-secret-key-change-this'  # Change this in production
 
 # Google Calendar Configuration
@@ -35,19 +61,102 @@ GOOGLE_CLIENT_SECRET = 'your-google-client-secret'  # Replace with your actual c
 GOOGLE_REDIRECT_URI = 'http://localhost:5000/api/auth/google/callback'
 GOOGLE_CALENDAR_SCOPE = 'https://www.googleapis.com/auth/calendar'
 
+# One pooled HTTP session for all Google API calls: keep-alive and TLS
+# session reuse save a handshake (~100-300ms) on every call after the first
+GOOGLE_SESSION = requests.Session()
+GOOGLE_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+
 # Create upload folder
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+class ORJSONResponse(Response):
+    """Response class defaulting to JSON so orjson-encoded bytes can be returned directly"""
+    default_mimetype = 'application/json'
+
+app.response_class = ORJSONResponse
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; covers request.json parsing and jsonify"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = ORJSONProvider(app)
+
+def json_response(payload, status=200):
+    """Serialize payload with orjson (5-6x faster than stdlib json) and wrap in a response"""
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return app.response_class(body, status=status)
+
+def generate_id():
+    """Time-ordered UUIDv7 hex string for primary keys.
+
+    The 48-bit millisecond timestamp prefix keeps inserts appending to the
+    hot B-tree page instead of splitting pages all over the index the way
+    random UUID4s do, and 32 hex chars store smaller than the 36-char
+    str(uuid4) form.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand = bytearray(os.urandom(10))
+    rand[0] = 0x70 | (rand[0] & 0x0F)  # version 7
+    rand[2] = 0x80 | (rand[2] & 0x3F)  # RFC 4122 variant
+    return (ts_ms.to_bytes(6, 'big') + bytes(rand)).hex()
+
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
 def allowed_image_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_IMAGE_EXTENSIONS
 
+MAX_IMAGE_SIZE = (2048, 2048)
+THUMBNAIL_SIZE = (800, 800)
+
+# Pillow decode/encode runs in worker processes so image-heavy uploads
+# parallelize across cores instead of blocking the WSGI request threads
+IMG_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+def process_image_upload(raw_bytes, file_path, thumb_path):
+    """Worker: decode, bound dimensions, re-encode to WebP and emit a thumbnail.
+
+    Runs in an IMG_POOL worker process; raises if the bytes are not a
+    decodable image. Re-encoding drops EXIF from both outputs.
+    """
+    img = Image.open(io.BytesIO(raw_bytes))
+    # For JPEGs, ask libjpeg to decode at a reduced scale straight away
+    # (no-op for other formats); thumbnail() below still does the exact
+    # LANCZOS resize, but from far fewer decoded pixels.
+    img.draft('RGB', MAX_IMAGE_SIZE)
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGB')
+    img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+    img.save(file_path, 'WEBP', quality=85, method=4)
+
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.save(thumb_path, 'JPEG', quality=85, optimize=True, progressive=True)
+
 def init_database():
     """Initialize the SQLite database with all required tables"""
     conn = sqlite3.connect(app.config['DATABASE'])
     cursor = conn.cursor()
-    
+
+    # Tune SQLite for concurrent access (WAL is persistent, so setting it
+    # once here covers every later connection). Not applicable to :memory:.
+    if app.config['DATABASE'] != ':memory:':
+        cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA cache_size=-65536')
+
     # Notes table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS notes (
@@ -73,9 +182,15 @@ def init_database():
             timestamp TEXT NOT NULL,
             category TEXT NOT NULL DEFAULT 'memories',
             tags TEXT DEFAULT '[]',
-            likes TEXT DEFAULT '[]'
+            likes TEXT DEFAULT '[]',
+            thumb_path TEXT
         )
     ''')
+
+    # Older databases predate thumb_path; add it if missing
+    cursor.execute('PRAGMA table_info(photos)')
+    if 'thumb_path' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE photos ADD COLUMN thumb_path TEXT')
     
     # Chores table
     cursor.execute('''
@@ -139,6 +254,16 @@ def init_database():
         )
     ''')
     
+    # Google OAuth tokens, keyed by the sid stored in the session cookie
+    # (server-side so every gunicorn worker sees the same sessions)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS google_tokens (
+            sid TEXT PRIMARY KEY,
+            token_info TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+
     # Calendar events table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS calendar_events (
@@ -151,10 +276,33 @@ def init_database():
             created_by TEXT NOT NULL,
             attendees TEXT DEFAULT '[]',
             location TEXT,
-            created_at TEXT NOT NULL
+            created_at TEXT NOT NULL,
+            updated_at TEXT
         )
     ''')
-    
+
+    # Older databases predate updated_at; add it if missing
+    cursor.execute('PRAGMA table_info(calendar_events)')
+    if 'updated_at' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE calendar_events ADD COLUMN updated_at TEXT')
+
+    # Indexes matching the hot WHERE / ORDER BY shapes of the list endpoints,
+    # so they become index range scans instead of full scans + temp sorts
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_notes_pinned_ts ON notes(pinned DESC, timestamp DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_photos_cat_ts ON photos(category, timestamp DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_chores_due ON chores(due_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_checkins_week ON checkins(week_of DESC)')
+    # The composite serves type-filtered views ordered by date from the
+    # index alone, and its type prefix also covers plain type lookups, so
+    # the old single-column type index is dropped
+    cursor.execute('DROP INDEX IF EXISTS idx_calendar_type')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_calendar_events_type_start ON calendar_events(type, start_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_calendar_events_start_date ON calendar_events(start_date)')
+
+    # Give the planner fresh stats for the indexes above
+    cursor.execute('ANALYZE')
+
     conn.commit()
     conn.close()
     print("✅ Database initialized successfully")
@@ -164,16 +312,162 @@ init_database()
 
 # ===== UTILITY FUNCTIONS =====
 
-def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(app.config['DATABASE'])
+DB_POOL_SIZE = 8
+
+# Idle connections waiting for reuse; opening one pays for the .db/.db-wal/
+# .db-shm file opens, the WAL attach and the per-connection pragmas, so
+# keeping them warm across requests saves all of that on every request
+# after the first.
+_db_pool = queue.Queue(maxsize=DB_POOL_SIZE)
+
+def _new_db_connection():
+    """Open and configure one poolable connection"""
+    conn = sqlite3.connect(app.config['DATABASE'], check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    # Wait instead of failing with "database is locked" when a writer is active
+    conn.execute('PRAGMA busy_timeout=5000')
+    # Unlike journal_mode=WAL (persistent, set at init), these pragmas are
+    # per-connection, so each pooled connection needs them. NORMAL skips the
+    # fsync at commit and syncs only on WAL checkpoints: a power cut can lose
+    # the last few commits but cannot corrupt the database.
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-65536')
     return conn
 
+def get_db_connection():
+    """Get the request-scoped database connection, checking one out of the pool on first use"""
+    if 'db' not in g:
+        try:
+            g.db = _db_pool.get_nowait()
+        except queue.Empty:
+            g.db = _new_db_connection()
+    return g.db
+
+@app.before_request
+def set_request_timestamp():
+    """Compute the request timestamp once; handlers reuse g.now_iso"""
+    g.now_iso = datetime.now().isoformat()
+
+@app.teardown_appcontext
+def close_db_connection(exception):
+    """Return the request-scoped connection to the pool when the app context ends"""
+    db = g.pop('db', None)
+    if db is not None:
+        if exception is not None:
+            # Don't recycle a connection whose transaction state is unknown
+            db.close()
+            return
+        db.rollback()
+        # Let SQLite refresh planner statistics for the indexes when cheap to do so
+        db.execute('PRAGMA optimize')
+        try:
+            _db_pool.put_nowait(db)
+        except queue.Full:
+            db.close()
+
 def dict_from_row(row):
     """Convert sqlite Row to dictionary"""
     return dict(zip(row.keys(), row)) if row else None
 
+def rows_to_dicts(cursor):
+    """Fetch all rows as dicts, reading column names from the cursor once.
+
+    Cheaper than dict_from_row per row: the key tuple is built a single
+    time instead of via row.keys() for every row.
+    """
+    cols = [d[0] for d in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+# SQL for the hot write paths, hoisted so every execute passes the same
+# string object and sqlite3's per-connection statement cache always hits
+NOTE_INSERT_SQL = '''
+    INSERT INTO notes (id, title, content, author, timestamp, type, pinned, reactions)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+PHOTO_INSERT_SQL = '''
+    INSERT INTO photos (id, filename, file_path, caption, uploaded_by, timestamp, category, tags, likes, thumb_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+CHORE_INSERT_SQL = '''
+    INSERT INTO chores (id, title, description, assigned_to, due_date, status, created_by, created_at, recurring, recurring_interval)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+EXPENSE_INSERT_SQL = '''
+    INSERT INTO expenses (id, title, amount, category, paid_by, split_between, date, description, settled)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+CHECKIN_INSERT_SQL = '''
+    INSERT INTO checkins (id, week_of, author, mood, stress_level, satisfaction, highlights, concerns, suggestions, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+NOTE_UPDATE_SQL = '''
+    UPDATE notes 
+    SET title=?, content=?, type=?, pinned=?, reactions=?
+    WHERE id=?
+'''
+
+# Toggles the author in reactions[:path]: the key is removed entirely once
+# its last author is gone. :path is a full json path built by the handler;
+# keys containing quotes/backslashes can't be addressed by json paths at all
+# and take the Python fallback in add_reaction instead.
+NOTE_REACTION_TOGGLE_SQL = '''
+    UPDATE notes SET reactions = CASE
+        WHEN EXISTS(
+            SELECT 1 FROM json_each(coalesce(json_extract(coalesce(nullif(reactions, ''), '{}'), :path), '[]'))
+            WHERE value = :author
+        ) THEN
+            CASE WHEN (
+                SELECT COUNT(*) FROM json_each(json_extract(reactions, :path))
+                WHERE value != :author
+            ) = 0
+            THEN json_remove(reactions, :path)
+            ELSE json_set(reactions, :path, (
+                SELECT json_group_array(value) FROM json_each(json_extract(reactions, :path))
+                WHERE value != :author
+            ))
+            END
+        ELSE json_set(coalesce(nullif(reactions, ''), '{}'), :path,
+            json_insert(coalesce(json_extract(coalesce(nullif(reactions, ''), '{}'), :path), '[]'), '$[#]', :author))
+    END
+    WHERE id = :note_id
+'''
+
+# Removes the user from likes if present, appends otherwise
+PHOTO_LIKE_TOGGLE_SQL = '''
+    UPDATE photos SET likes = CASE
+        WHEN EXISTS(SELECT 1 FROM json_each(coalesce(nullif(likes, ''), '[]')) WHERE value = :user)
+        THEN (SELECT json_group_array(value) FROM json_each(likes) WHERE value != :user)
+        ELSE json_insert(coalesce(nullif(likes, ''), '[]'), '$[#]', :user)
+    END
+    WHERE id = :photo_id
+'''
+
+CHORE_UPDATE_SQL = '''
+    UPDATE chores 
+    SET title=?, description=?, assigned_to=?, due_date=?, status=?, completed_at=?, recurring=?, recurring_interval=?
+    WHERE id=?
+'''
+
+# Insert-or-update in one statement: POST, PUT and the Google sync all go
+# through this, which also makes re-syncing the same Google event ids
+# idempotent instead of growing duplicates
+EVENT_UPSERT_SQL = '''
+    INSERT INTO calendar_events (id, title, description, start_date, end_date, type, created_by, attendees, location, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title=excluded.title, description=excluded.description,
+        start_date=excluded.start_date, end_date=excluded.end_date,
+        type=excluded.type, attendees=excluded.attendees, location=excluded.location,
+        updated_at=excluded.updated_at
+'''
+
 # ===== HEALTH CHECK =====
 
 @app.route('/api/health', methods=['GET'])
@@ -181,13 +475,13 @@ def health_check():
     """Health check endpoint"""
     status = {
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': g.now_iso,
         'services': {
             'database': True,
             'file_storage': os.path.exists(app.config['UPLOAD_FOLDER'])
         }
     }
-    return jsonify(status)
+    return json_response(status)
 
 # ===== NOTES ENDPOINTS =====
 
@@ -198,47 +492,48 @@ def handle_notes():
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
+            # SQLite's json1 builds the entire response body in C —
+            # no per-row Python dicts, no re-encode of stored reactions JSON
             cursor.execute('''
-                SELECT * FROM notes 
-                ORDER BY pinned DESC, timestamp DESC
+                SELECT json_group_array(json_object(
+                    'id', id, 'title', title, 'content', content, 'author', author,
+                    'timestamp', timestamp, 'type', type,
+                    'pinned', json(iif(pinned, 'true', 'false')),
+                    'reactions', json(coalesce(nullif(reactions, ''), '{}'))
+                ))
+                FROM (
+                    SELECT id, title, content, author, timestamp, type, pinned, reactions
+                    FROM notes
+                    ORDER BY pinned DESC, timestamp DESC
+                )
             ''')
-            notes = [dict_from_row(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            # Parse JSON fields
-            for note in notes:
-                note['reactions'] = json.loads(note['reactions'] or '{}')
-            
-            return jsonify(notes)
+
+            return app.response_class(cursor.fetchone()[0])
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'POST':
         try:
             data = request.json
-            note_id = str(uuid.uuid4())
+            note_id = generate_id()
             
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO notes (id, title, content, author, timestamp, type, pinned, reactions)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(NOTE_INSERT_SQL, (
                 note_id,
                 data['title'],
                 data['content'],
                 data['author'],
-                datetime.now().isoformat(),
+                g.now_iso,
                 data.get('type', 'general'),
                 data.get('pinned', False),
-                json.dumps(data.get('reactions', {}))
+                orjson.dumps(data.get('reactions', {})).decode()
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'id': note_id, 'message': 'Note created successfully'}), 201
+            return json_response({'id': note_id, 'message': 'Note created successfully'}, 201)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 @app.route('/api/notes/<note_id>', methods=['PUT', 'DELETE'])
 def handle_note(note_id):
@@ -249,25 +544,19 @@ def handle_note(note_id):
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            # Update note
-            cursor.execute('''
-                UPDATE notes 
-                SET title=?, content=?, type=?, pinned=?, reactions=?
-                WHERE id=?
-            ''', (
+            cursor.execute(NOTE_UPDATE_SQL, (
                 data['title'],
                 data['content'],
                 data['type'],
                 data['pinned'],
-                json.dumps(data['reactions']),
+                orjson.dumps(data['reactions']).decode(),
                 note_id
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'message': 'Note updated successfully'})
+            return json_response({'message': 'Note updated successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'DELETE':
         try:
@@ -275,11 +564,10 @@ def handle_note(note_id):
             cursor = conn.cursor()
             cursor.execute('DELETE FROM notes WHERE id=?', (note_id,))
             conn.commit()
-            conn.close()
             
-            return jsonify({'message': 'Note deleted successfully'})
+            return json_response({'message': 'Note deleted successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 @app.route('/api/notes/<note_id>/react', methods=['POST'])
 def add_reaction(note_id):
@@ -288,33 +576,37 @@ def add_reaction(note_id):
         data = request.json
         emoji = data['emoji']
         author = data['author']
-        
+
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT reactions FROM notes WHERE id=?', (note_id,))
-        result = cursor.fetchone()
-        
-        if result:
-            reactions = json.loads(result['reactions'] or '{}')
-            
-            if emoji not in reactions:
-                reactions[emoji] = []
-            
-            if author in reactions[emoji]:
-                reactions[emoji].remove(author)
-                if not reactions[emoji]:
-                    del reactions[emoji]
+        if '"' in emoji or '\\' in emoji:
+            # SQLite json paths can't address keys containing quotes or
+            # backslashes, so toggle those the slow way in Python
+            cursor.execute('SELECT reactions FROM notes WHERE id=?', (note_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return json_response({'error': 'Note not found'}, 404)
+            reactions = orjson.loads(row['reactions'] or '{}')
+            authors = reactions.get(emoji, [])
+            if author in authors:
+                authors.remove(author)
+                if not authors:
+                    reactions.pop(emoji, None)
             else:
-                reactions[emoji].append(author)
-            
-            cursor.execute('UPDATE notes SET reactions=? WHERE id=?', 
-                         (json.dumps(reactions), note_id))
-            conn.commit()
-        
-        conn.close()
-        return jsonify({'message': 'Reaction updated successfully'})
+                reactions[emoji] = authors + [author]
+            cursor.execute('UPDATE notes SET reactions=? WHERE id=?',
+                           (orjson.dumps(reactions).decode(), note_id))
+        else:
+            # One json1 UPDATE instead of SELECT + Python JSON round-trip + UPDATE
+            cursor.execute(NOTE_REACTION_TOGGLE_SQL,
+                           {'path': f'$."{emoji}"', 'author': author, 'note_id': note_id})
+            if cursor.rowcount == 0:
+                return json_response({'error': 'Note not found'}, 404)
+        conn.commit()
+
+        return json_response({'message': 'Reaction updated successfully'})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 # ===== PHOTOS ENDPOINTS =====
 
@@ -328,92 +620,156 @@ def handle_photos():
             conn = get_db_connection()
             cursor = conn.cursor()
             
+            # Explicit column list: skips decoding the internal path columns
+            # per row and keeps them out of the response payload
+            photo_cols = 'id, filename, caption, uploaded_by, timestamp, category, tags, likes'
             if category == 'all':
-                cursor.execute('SELECT * FROM photos ORDER BY timestamp DESC')
+                cursor.execute(f'SELECT {photo_cols} FROM photos ORDER BY timestamp DESC')
             else:
-                cursor.execute('SELECT * FROM photos WHERE category=? ORDER BY timestamp DESC', (category,))
-            
-            photos = [dict_from_row(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            # Parse JSON fields and add full URL
-            for photo in photos:
-                photo['tags'] = json.loads(photo['tags'] or '[]')
-                photo['likes'] = json.loads(photo['likes'] or '[]')
-                photo['url'] = f"/api/photos/{photo['id']}/file"
-            
-            return jsonify(photos)
+                cursor.execute(f'SELECT {photo_cols} FROM photos WHERE category=? ORDER BY timestamp DESC', (category,))
+            
+            # Stream rows incrementally, passing tags/likes JSON through as-is
+            def stream():
+                yield b'['
+                first = True
+                for row in cursor:
+                    photo = dict_from_row(row)
+                    photo['tags'] = orjson.Fragment(photo['tags'] or '[]')
+                    photo['likes'] = orjson.Fragment(photo['likes'] or '[]')
+                    photo['url'] = f"/api/photos/{photo['id']}/file"
+                    photo['thumb_url'] = f"/api/photos/{photo['id']}/thumb"
+                    if not first:
+                        yield b','
+                    first = False
+                    yield orjson.dumps(photo)
+                yield b']'
+
+            return app.response_class(stream_with_context(stream()))
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'POST':
         try:
             if 'photo' not in request.files:
-                return jsonify({'error': 'No photo provided'}), 400
+                return json_response({'error': 'No photo provided'}, 400)
             
             file = request.files['photo']
             if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
+                return json_response({'error': 'No file selected'}, 400)
             
             if not allowed_image_file(file.filename):
-                return jsonify({'error': 'Invalid file type. Please upload an image.'}), 400
+                return json_response({'error': 'Invalid file type. Please upload an image.'}, 400)
             
             # Generate unique filename
-            photo_id = str(uuid.uuid4())
+            photo_id = generate_id()
             filename = secure_filename(file.filename)
-            file_extension = filename.rsplit('.', 1)[1].lower()
-            unique_filename = f"{photo_id}.{file_extension}"
+            unique_filename = f"{photo_id}.webp"
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            # Save file
-            file.save(file_path)
-            
+
+            # Hand the raw bytes to an image worker process: it validates,
+            # bounds dimensions, re-encodes to WebP (~30% smaller than JPEG
+            # at matched quality) and writes the gallery thumbnail, keeping
+            # libjpeg/libwebp work off the request thread
+            thumb_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{photo_id}_thumb.jpg")
+            try:
+                IMG_POOL.submit(process_image_upload, file.read(), file_path, thumb_path).result()
+            except Exception:
+                return json_response({'error': 'Invalid or corrupted image file'}, 400)
+
             # Get form data
             caption = request.form.get('caption', '')
             uploaded_by = request.form.get('uploadedBy', 'Unknown')
             category = request.form.get('category', 'memories')
-            tags = json.loads(request.form.get('tags', '[]'))
-            
+            tags = orjson.loads(request.form.get('tags', '[]'))
+
             # Save to database
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO photos (id, filename, file_path, caption, uploaded_by, timestamp, category, tags, likes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(PHOTO_INSERT_SQL, (
                 photo_id,
                 filename,
                 file_path,
                 caption,
                 uploaded_by,
-                datetime.now().isoformat(),
+                g.now_iso,
                 category,
-                json.dumps(tags),
-                json.dumps([])
+                orjson.dumps(tags).decode(),
+                orjson.dumps([]).decode(),
+                thumb_path
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'id': photo_id, 'message': 'Photo uploaded successfully'}), 201
+            return json_response({'id': photo_id, 'message': 'Photo uploaded successfully'}, 201)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
+
+def send_photo(path, max_age):
+    """Serve a photo from disk, offloading to the proxy when configured.
+
+    With ACCEL_REDIRECT_BASE set, an empty response carrying the
+    X-Accel-Redirect header is returned and nginx streams the file itself,
+    freeing the worker immediately. Otherwise falls back to send_file.
+    """
+    base = app.config['ACCEL_REDIRECT_BASE']
+    if base:
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = Response('', mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f'{base}/{os.path.basename(path)}'
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        return response
+    return send_file(
+        path,
+        conditional=True,
+        etag=True,
+        last_modified=os.path.getmtime(path),
+        max_age=max_age
+    )
+
+# photo_id -> (file_path, thumb_path). Paths never change after upload, so
+# entries only need evicting when a photo is deleted; a typical gallery page
+# otherwise costs one SELECT per <img> tag on every load
+_photo_path_cache = {}
+
+def get_photo_paths(photo_id):
+    """Look up a photo's file and thumbnail paths, caching hits"""
+    paths = _photo_path_cache.get(photo_id)
+    if paths is None:
+        conn = get_db_connection()
+        row = conn.execute('SELECT file_path, thumb_path FROM photos WHERE id=?', (photo_id,)).fetchone()
+        if row is None:
+            return None
+        paths = (row['file_path'], row['thumb_path'])
+        if len(_photo_path_cache) >= 4096:
+            _photo_path_cache.clear()
+        _photo_path_cache[photo_id] = paths
+    return paths
 
 @app.route('/api/photos/<photo_id>/file', methods=['GET'])
 def get_photo_file(photo_id):
     """Serve photo file"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT file_path FROM photos WHERE id=?', (photo_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and os.path.exists(result['file_path']):
-            return send_file(result['file_path'])
+        paths = get_photo_paths(photo_id)
+
+        if paths and os.path.exists(paths[0]):
+            return send_photo(paths[0], max_age=86400)
         else:
-            return jsonify({'error': 'Photo not found'}), 404
+            return json_response({'error': 'Photo not found'}, 404)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/photos/<photo_id>/thumb', methods=['GET'])
+def get_photo_thumb(photo_id):
+    """Serve photo thumbnail (falls back to the original if none exists)"""
+    try:
+        paths = get_photo_paths(photo_id)
+
+        if paths:
+            path = paths[1] or paths[0]
+            if os.path.exists(path):
+                return send_photo(path, max_age=31536000)
+        return json_response({'error': 'Photo not found'}, 404)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/photos/<photo_id>', methods=['DELETE'])
 def delete_photo(photo_id):
@@ -421,51 +777,39 @@ def delete_photo(photo_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT file_path FROM photos WHERE id=?', (photo_id,))
+        cursor.execute('SELECT file_path, thumb_path FROM photos WHERE id=?', (photo_id,))
         result = cursor.fetchone()
-        
+
         if result:
-            # Delete file
+            # Delete file and its thumbnail
             if os.path.exists(result['file_path']):
                 os.remove(result['file_path'])
+            if result['thumb_path'] and os.path.exists(result['thumb_path']):
+                os.remove(result['thumb_path'])
             
-            # Delete from database
+            # Delete from database and drop the cached paths
             cursor.execute('DELETE FROM photos WHERE id=?', (photo_id,))
             conn.commit()
+            _photo_path_cache.pop(photo_id, None)
         
-        conn.close()
-        return jsonify({'message': 'Photo deleted successfully'})
+        return json_response({'message': 'Photo deleted successfully'})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/photos/<photo_id>/like', methods=['POST'])
 def toggle_photo_like(photo_id):
     """Toggle like on a photo"""
     try:
         data = request.json
-        user = data['user']
-        
+
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT likes FROM photos WHERE id=?', (photo_id,))
-        result = cursor.fetchone()
-        
-        if result:
-            likes = json.loads(result['likes'] or '[]')
-            
-            if user in likes:
-                likes.remove(user)
-            else:
-                likes.append(user)
-            
-            cursor.execute('UPDATE photos SET likes=? WHERE id=?', 
-                         (json.dumps(likes), photo_id))
-            conn.commit()
-        
-        conn.close()
-        return jsonify({'message': 'Like updated successfully'})
+        cursor.execute(PHOTO_LIKE_TOGGLE_SQL, {'user': data['user'], 'photo_id': photo_id})
+        conn.commit()
+
+        return json_response({'message': 'Like updated successfully'})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 # ===== CHORES ENDPOINTS =====
 
@@ -476,25 +820,25 @@ def handle_chores():
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM chores ORDER BY due_date ASC')
-            chores = [dict_from_row(row) for row in cursor.fetchall()]
-            conn.close()
+            cursor.execute('''
+                SELECT id, title, description, assigned_to, due_date, status,
+                       created_by, created_at, completed_at, recurring, recurring_interval
+                FROM chores ORDER BY due_date ASC
+            ''')
+            chores = rows_to_dicts(cursor)
             
-            return jsonify(chores)
+            return json_response(chores)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'POST':
         try:
             data = request.json
-            chore_id = str(uuid.uuid4())
+            chore_id = generate_id()
             
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO chores (id, title, description, assigned_to, due_date, status, created_by, created_at, recurring, recurring_interval)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(CHORE_INSERT_SQL, (
                 chore_id,
                 data['title'],
                 data.get('description', ''),
@@ -502,16 +846,15 @@ def handle_chores():
                 data.get('due_date'),
                 data.get('status', 'pending'),
                 data['created_by'],
-                datetime.now().isoformat(),
+                g.now_iso,
                 data.get('recurring', False),
                 data.get('recurring_interval')
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'id': chore_id, 'message': 'Chore created successfully'}), 201
+            return json_response({'id': chore_id, 'message': 'Chore created successfully'}, 201)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 @app.route('/api/chores/<chore_id>', methods=['PUT', 'DELETE'])
 def handle_chore(chore_id):
@@ -523,13 +866,9 @@ def handle_chore(chore_id):
             cursor = conn.cursor()
             
             # If marking as completed, set completed_at
-            completed_at = datetime.now().isoformat() if data.get('status') == 'completed' else None
+            completed_at = g.now_iso if data.get('status') == 'completed' else None
             
-            cursor.execute('''
-                UPDATE chores 
-                SET title=?, description=?, assigned_to=?, due_date=?, status=?, completed_at=?, recurring=?, recurring_interval=?
-                WHERE id=?
-            ''', (
+            cursor.execute(CHORE_UPDATE_SQL, (
                 data['title'],
                 data.get('description', ''),
                 data['assigned_to'],
@@ -541,11 +880,10 @@ def handle_chore(chore_id):
                 chore_id
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'message': 'Chore updated successfully'})
+            return json_response({'message': 'Chore updated successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'DELETE':
         try:
@@ -553,11 +891,10 @@ def handle_chore(chore_id):
             cursor = conn.cursor()
             cursor.execute('DELETE FROM chores WHERE id=?', (chore_id,))
             conn.commit()
-            conn.close()
             
-            return jsonify({'message': 'Chore deleted successfully'})
+            return json_response({'message': 'Chore deleted successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 # ===== EXPENSES ENDPOINTS =====
 
@@ -568,45 +905,45 @@ def handle_expenses():
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM expenses ORDER BY date DESC')
-            expenses = [dict_from_row(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            # Parse JSON fields
+            cursor.execute('''
+                SELECT id, title, amount, category, paid_by, split_between,
+                       date, description, receipt_path, settled
+                FROM expenses ORDER BY date DESC
+            ''')
+            expenses = rows_to_dicts(cursor)
+
+            # split_between is already valid JSON in the DB; inline it as an
+            # orjson.Fragment instead of decoding and re-encoding it
             for expense in expenses:
-                expense['split_between'] = json.loads(expense['split_between'])
-            
-            return jsonify(expenses)
+                expense['split_between'] = orjson.Fragment(expense['split_between'])
+
+            return app.response_class(orjson.dumps(expenses))
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'POST':
         try:
             data = request.json
-            expense_id = str(uuid.uuid4())
+            expense_id = generate_id()
             
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO expenses (id, title, amount, category, paid_by, split_between, date, description, settled)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(EXPENSE_INSERT_SQL, (
                 expense_id,
                 data['title'],
                 data['amount'],
                 data['category'],
                 data['paid_by'],
-                json.dumps(data['split_between']),
+                orjson.dumps(data['split_between']).decode(),
                 data['date'],
                 data.get('description', ''),
                 data.get('settled', False)
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'id': expense_id, 'message': 'Expense created successfully'}), 201
+            return json_response({'id': expense_id, 'message': 'Expense created successfully'}, 201)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 # ===== WEEKLY CHECK-INS ENDPOINTS =====
 
@@ -617,25 +954,25 @@ def handle_checkins():
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM checkins ORDER BY week_of DESC')
-            checkins = [dict_from_row(row) for row in cursor.fetchall()]
-            conn.close()
+            cursor.execute('''
+                SELECT id, week_of, author, mood, stress_level, satisfaction,
+                       highlights, concerns, suggestions, timestamp
+                FROM checkins ORDER BY week_of DESC
+            ''')
+            checkins = rows_to_dicts(cursor)
             
-            return jsonify(checkins)
+            return json_response(checkins)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'POST':
         try:
             data = request.json
-            checkin_id = str(uuid.uuid4())
+            checkin_id = generate_id()
             
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO checkins (id, week_of, author, mood, stress_level, satisfaction, highlights, concerns, suggestions, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(CHECKIN_INSERT_SQL, (
                 checkin_id,
                 data['week_of'],
                 data['author'],
@@ -645,17 +982,43 @@ def handle_checkins():
                 data.get('highlights', ''),
                 data.get('concerns', ''),
                 data.get('suggestions', ''),
-                datetime.now().isoformat()
+                g.now_iso
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'id': checkin_id, 'message': 'Check-in created successfully'}), 201
+            return json_response({'id': checkin_id, 'message': 'Check-in created successfully'}, 201)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 # ===== GOOGLE CALENDAR INTEGRATION =====
 
+# Server-side OAuth token store, backed by the google_tokens table. The
+# signed session cookie carries only a short random sid, so every response
+# stops paying HMAC-over-token cost and several hundred cookie bytes — and
+# unlike an in-process dict, the table is shared by all gunicorn workers.
+
+def store_google_tokens(token_info):
+    """Keep the OAuth tokens server-side, leaving only a sid in the cookie"""
+    sid = os.urandom(16).hex()
+    conn = get_db_connection()
+    conn.execute(
+        'INSERT INTO google_tokens (sid, token_info, created_at) VALUES (?, ?, ?)',
+        (sid, orjson.dumps(token_info).decode(), g.now_iso)
+    )
+    conn.commit()
+    session['google_sid'] = sid
+
+def get_google_access_token():
+    """Look up the access token for this session's sid, or None"""
+    sid = session.get('google_sid')
+    if sid is None:
+        return None
+    row = get_db_connection().execute(
+        'SELECT token_info FROM google_tokens WHERE sid = ?', (sid,)
+    ).fetchone()
+    return orjson.loads(row['token_info']).get('access_token') if row else None
+
+
 @app.route('/api/auth/google', methods=['GET'])
 def google_auth():
     """Initiate Google OAuth flow"""
@@ -670,14 +1033,14 @@ def google_auth():
     }
     
     auth_url_with_params = f"{auth_url}?{urlencode(params)}"
-    return jsonify({'auth_url': auth_url_with_params})
+    return json_response({'auth_url': auth_url_with_params})
 
 @app.route('/api/auth/google/callback', methods=['GET'])
 def google_callback():
     """Handle Google OAuth callback"""
     code = request.args.get('code')
     if not code:
-        return jsonify({'error': 'Authorization code not provided'}), 400
+        return json_response({'error': 'Authorization code not provided'}, 400)
     
     # Exchange code for access token
     token_url = 'https://oauth2.googleapis.com/token'
@@ -690,14 +1053,12 @@ def google_callback():
     }
     
     try:
-        response = requests.post(token_url, data=token_data)
+        response = GOOGLE_SESSION.post(token_url, data=token_data)
         token_info = response.json()
         
         if 'access_token' in token_info:
-            # Store tokens in session or database
-            session['google_access_token'] = token_info['access_token']
-            if 'refresh_token' in token_info:
-                session['google_refresh_token'] = token_info['refresh_token']
+            # Tokens stay server-side; the cookie only carries a sid
+            store_google_tokens(token_info)
             
             # Redirect to frontend with success
             return redirect('http://localhost:3000/calendar?auth=success')
@@ -710,64 +1071,65 @@ def google_callback():
 @app.route('/api/calendar/google/events', methods=['GET'])
 def get_google_calendar_events():
     """Get events from Google Calendar"""
-    access_token = session.get('google_access_token')
+    access_token = get_google_access_token()
     if not access_token:
-        return jsonify({'error': 'Not authenticated with Google'}), 401
-    
+        return json_response({'error': 'Not authenticated with Google'}, 401)
+
     try:
-        # Get calendar events
-        calendar_url = 'https://www.googleapis.com/calendar/v3/calendars/primary/events'
-        headers = {'Authorization': f'Bearer {access_token}'}
-        
-        # Get events for the next month
-        time_min = datetime.now().isoformat() + 'Z'
-        time_max = (datetime.now() + timedelta(days=30)).isoformat() + 'Z'
-        
-        params = {
-            'timeMin': time_min,
-            'timeMax': time_max,
-            'singleEvents': True,
-            'orderBy': 'startTime'
-        }
-        
-        response = requests.get(calendar_url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            events_data = response.json()
-            
-            # Transform Google Calendar events to our format
-            events = []
-            for event in events_data.get('items', []):
-                start_time = event.get('start', {})
-                end_time = event.get('end', {})
-                
-                events.append({
-                    'id': event['id'],
-                    'title': event.get('summary', 'No Title'),
-                    'description': event.get('description', ''),
-                    'start_date': start_time.get('dateTime', start_time.get('date')),
-                    'end_date': end_time.get('dateTime', end_time.get('date')),
-                    'type': 'google_calendar',
-                    'created_by': 'Google Calendar',
-                    'attendees': [attendee.get('email', '') for attendee in event.get('attendees', [])],
-                    'location': event.get('location', ''),
-                    'source': 'google'
-                })
-            
-            return jsonify(events)
-        else:
-            return jsonify({'error': 'Failed to fetch Google Calendar events'}), response.status_code
-            
+        return json_response(_fetch_google_events(access_token))
     except Exception as e:
         print(f"Error fetching Google Calendar events: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+def _fetch_google_events(access_token):
+    """Fetch the next month of Google Calendar events, transformed to our format.
+
+    Returns a plain list so callers like the sync endpoint can use the data
+    directly without a JSON encode/decode round-trip; raises on API failure.
+    """
+    calendar_url = 'https://www.googleapis.com/calendar/v3/calendars/primary/events'
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    params = {
+        'timeMin': datetime.now().isoformat() + 'Z',
+        'timeMax': (datetime.now() + timedelta(days=30)).isoformat() + 'Z',
+        'singleEvents': True,
+        'orderBy': 'startTime'
+    }
+
+    response = GOOGLE_SESSION.get(calendar_url, headers=headers, params=params)
+    if response.status_code != 200:
+        raise Exception(f'Failed to fetch Google Calendar events (HTTP {response.status_code})')
+
+    events_data = response.json()
+
+    # Transform Google Calendar events to our format
+    events = []
+    for event in events_data.get('items', []):
+        start_time = event.get('start', {})
+        end_time = event.get('end', {})
+
+        events.append({
+            'id': event['id'],
+            'title': event.get('summary', 'No Title'),
+            'description': event.get('description', ''),
+            'start_date': start_time.get('dateTime', start_time.get('date')),
+            'end_date': end_time.get('dateTime', end_time.get('date')),
+            'type': 'google_calendar',
+            'created_by': 'Google Calendar',
+            'attendees': [attendee.get('email', '') for attendee in event.get('attendees', [])],
+            'location': event.get('location', ''),
+            'source': 'google'
+        })
+
+    return events
 
 @app.route('/api/calendar/google/create', methods=['POST'])
 def create_google_calendar_event():
     """Create event in Google Calendar"""
-    access_token = session.get('google_access_token')
+    access_token = get_google_access_token()
     if not access_token:
-        return jsonify({'error': 'Not authenticated with Google'}), 401
+        return json_response({'error': 'Not authenticated with Google'}, 401)
     
     try:
         data = request.json
@@ -794,19 +1156,16 @@ def create_google_calendar_event():
             'attendees': [{'email': email} for email in data.get('attendees', [])]
         }
         
-        response = requests.post(calendar_url, headers=headers, json=event_data)
+        response = GOOGLE_SESSION.post(calendar_url, headers=headers, json=event_data)
         
         if response.status_code == 200:
             google_event = response.json()
             
             # Also save to local database
-            event_id = str(uuid.uuid4())
+            event_id = generate_id()
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO calendar_events (id, title, description, start_date, end_date, type, created_by, attendees, location, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(EVENT_UPSERT_SQL, (
                 event_id,
                 data['title'],
                 data.get('description', ''),
@@ -814,76 +1173,81 @@ def create_google_calendar_event():
                 data['end_date'],
                 'google_sync',
                 data.get('created_by', 'System'),
-                json.dumps(data.get('attendees', [])),
+                orjson.dumps(data.get('attendees', [])).decode(),
                 data.get('location', ''),
-                datetime.now().isoformat()
+                g.now_iso,
+                g.now_iso
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({
+            return json_response({
                 'id': google_event['id'],
                 'message': 'Event created in Google Calendar and synced locally'
             })
         else:
-            return jsonify({'error': 'Failed to create Google Calendar event'}), response.status_code
+            return json_response({'error': 'Failed to create Google Calendar event'}, response.status_code)
             
     except Exception as e:
         print(f"Error creating Google Calendar event: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/calendar/sync', methods=['POST'])
 def sync_google_calendar():
     """Manual sync with Google Calendar"""
+    access_token = get_google_access_token()
+    if not access_token:
+        return json_response({'error': 'Not authenticated with Google'}, 401)
+
     try:
-        # Fetch Google Calendar events
-        google_events_response = get_google_calendar_events()
-        
-        if google_events_response.status_code == 200:
-            google_events = json.loads(google_events_response.data)
-            
-            # Update local database with Google events
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Clear existing Google sync events
-            cursor.execute('DELETE FROM calendar_events WHERE type = "google_sync"')
-            
-            # Insert new Google events
-            for event in google_events:
-                event_id = str(uuid.uuid4())
-                cursor.execute('''
-                    INSERT INTO calendar_events (id, title, description, start_date, end_date, type, created_by, attendees, location, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    event_id,
-                    event['title'],
-                    event['description'],
-                    event['start_date'],
-                    event['end_date'],
-                    'google_sync',
-                    'Google Calendar',
-                    json.dumps(event['attendees']),
-                    event['location'],
-                    datetime.now().isoformat()
-                ))
-            
-            conn.commit()
-            conn.close()
-            
-            return jsonify({'message': f'Synced {len(google_events)} events from Google Calendar'})
+        # Fetch Google Calendar events directly as a Python list — no JSON
+        # encode/decode round-trip through the events endpoint
+        google_events = _fetch_google_events(access_token)
+
+        # Update local database with Google events
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        # Upsert keyed on the stable Google event id: re-syncing updates
+        # rows in place in one transaction instead of delete + reinsert
+        rows = [(
+            event['id'],
+            event['title'],
+            event['description'],
+            event['start_date'],
+            event['end_date'],
+            'google_sync',
+            'Google Calendar',
+            orjson.dumps(event['attendees']).decode(),
+            event['location'],
+            g.now_iso,
+            g.now_iso
+        ) for event in google_events]
+
+        # Purge synced events that no longer exist upstream, then upsert the
+        # current set — all in the same transaction
+        synced_ids = [row[0] for row in rows]
+        if synced_ids:
+            placeholders = ','.join('?' * len(synced_ids))
+            cursor.execute(
+                f"DELETE FROM calendar_events WHERE type = 'google_sync' AND id NOT IN ({placeholders})",
+                synced_ids
+            )
         else:
-            return jsonify({'error': 'Failed to sync with Google Calendar'}), 500
-            
+            cursor.execute('DELETE FROM calendar_events WHERE type = "google_sync"')
+        cursor.executemany(EVENT_UPSERT_SQL, rows)
+
+        conn.commit()
+
+        return json_response({'message': f'Synced {len(google_events)} events from Google Calendar'})
     except Exception as e:
         print(f"Error syncing Google Calendar: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/auth/google/status', methods=['GET'])
 def google_auth_status():
     """Check Google authentication status"""
-    access_token = session.get('google_access_token')
-    return jsonify({'authenticated': bool(access_token)})
+    access_token = get_google_access_token()
+    return json_response({'authenticated': bool(access_token)})
 
 # ===== CALENDAR EVENTS ENDPOINTS =====
 
@@ -895,42 +1259,63 @@ def handle_calendar_events():
             view = request.args.get('view', 'month')
             start_date = request.args.get('start_date')
             end_date = request.args.get('end_date')
-            
+            limit = request.args.get('limit', type=int)
+            offset = request.args.get('offset', 0, type=int)
+
             conn = get_db_connection()
             cursor = conn.cursor()
-            
-            query = 'SELECT * FROM calendar_events'
+
+            where = ''
             params = []
-            
+
             if start_date and end_date:
-                query += ' WHERE start_date >= ? AND start_date <= ?'
+                where = ' WHERE start_date >= ? AND start_date <= ?'
                 params.extend([start_date, end_date])
-            
-            query += ' ORDER BY start_date ASC'
-            
+
+            # Cheap change fingerprint: an aggregate MAX+COUNT answers
+            # repeated calendar polls with a 304 before any row is read.
+            # updated_at moves on every upsert (created_at deliberately
+            # doesn't), and the filter and page bounds are hashed in so
+            # different pages never share an ETag.
+            cursor.execute(
+                f'SELECT MAX(coalesce(updated_at, created_at)), COUNT(*) FROM calendar_events{where}',
+                params
+            )
+            max_updated, count = cursor.fetchone()
+            etag = sha1(
+                f'{start_date}:{end_date}:{limit}:{offset}:{max_updated}:{count}'.encode()
+            ).hexdigest()
+            if request.if_none_match.contains(etag):
+                return Response(status=304)
+
+            query = ('SELECT id, title, description, start_date, end_date, type, '
+                     'created_by, attendees, location, created_at FROM calendar_events'
+                     + where + ' ORDER BY start_date ASC')
+            if limit is not None:
+                query += ' LIMIT ? OFFSET ?'
+                params.extend([limit, offset])
+
             cursor.execute(query, params)
-            events = [dict_from_row(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            # Parse JSON fields
+            events = rows_to_dicts(cursor)
+
+            # attendees passes through as a raw JSON fragment — no re-parse
             for event in events:
-                event['attendees'] = json.loads(event['attendees'] or '[]')
-            
-            return jsonify(events)
+                event['attendees'] = orjson.Fragment(event['attendees'] or '[]')
+
+            response = app.response_class(orjson.dumps(events))
+            response.set_etag(etag)
+            return response
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'POST':
         try:
             data = request.json
-            event_id = str(uuid.uuid4())
+            event_id = generate_id()
             
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO calendar_events (id, title, description, start_date, end_date, type, created_by, attendees, location, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(EVENT_UPSERT_SQL, (
                 event_id,
                 data['title'],
                 data.get('description', ''),
@@ -938,16 +1323,16 @@ def handle_calendar_events():
                 data.get('end_date'),
                 data.get('type', 'event'),
                 data['created_by'],
-                json.dumps(data.get('attendees', [])),
+                orjson.dumps(data.get('attendees', [])).decode(),
                 data.get('location', ''),
-                datetime.now().isoformat()
+                g.now_iso,
+                g.now_iso
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'id': event_id, 'message': 'Event created successfully'}), 201
+            return json_response({'id': event_id, 'message': 'Event created successfully'}, 201)
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 @app.route('/api/calendar/events/<event_id>', methods=['PUT', 'DELETE'])
 def handle_calendar_event(event_id):
@@ -958,26 +1343,26 @@ def handle_calendar_event(event_id):
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            cursor.execute('''
-                UPDATE calendar_events 
-                SET title=?, description=?, start_date=?, end_date=?, type=?, attendees=?, location=?
-                WHERE id=?
-            ''', (
+            # Upsert: updates the event in place, or creates it if the
+            # client is syncing an id the server has not seen yet
+            cursor.execute(EVENT_UPSERT_SQL, (
+                event_id,
                 data['title'],
                 data.get('description', ''),
                 data['start_date'],
                 data.get('end_date'),
                 data.get('type', 'event'),
-                json.dumps(data.get('attendees', [])),
+                data.get('created_by', 'System'),
+                orjson.dumps(data.get('attendees', [])).decode(),
                 data.get('location', ''),
-                event_id
+                g.now_iso,
+                g.now_iso
             ))
             conn.commit()
-            conn.close()
             
-            return jsonify({'message': 'Event updated successfully'})
+            return json_response({'message': 'Event updated successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
     
     elif request.method == 'DELETE':
         try:
@@ -985,59 +1370,82 @@ def handle_calendar_event(event_id):
             cursor = conn.cursor()
             cursor.execute('DELETE FROM calendar_events WHERE id=?', (event_id,))
             conn.commit()
-            conn.close()
             
-            return jsonify({'message': 'Event deleted successfully'})
+            return json_response({'message': 'Event deleted successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return json_response({'error': str(e)}, 500)
 
 # ===== DATA EXPORT/IMPORT =====
 
+# Fixed whitelist of exportable tables; the export SQL interpolates table
+# names, so they must only ever come from this tuple, never from the request
+EXPORT_TABLES = ('notes', 'photos', 'chores', 'expenses', 'checkins', 'house_rules', 'calendar_events')
+
+# SQL built once at import — no string formatting in the request path and
+# nowhere for a non-whitelisted table name to sneak in
+EXPORT_SQL = tuple((table, f'SELECT * FROM {table}') for table in EXPORT_TABLES)
+
+def _export_rows(conn):
+    """Yield (table, row_dict) for every row of every exportable table"""
+    # fetchmany amortizes the C-level fetch boundary across 1000 rows
+    # while keeping memory bounded to a batch
+    cursor = conn.cursor()
+    for table, sql in EXPORT_SQL:
+        cursor.execute(sql)
+        cols = [d[0] for d in cursor.description]
+        while rows := cursor.fetchmany(1000):
+            for row in rows:
+                yield table, dict(zip(cols, row))
+
 @app.route('/api/export', methods=['GET'])
 def export_data():
-    """Export all data as JSON"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        export_data = {}
-        
-        # Export all tables
-        tables = ['notes', 'photos', 'chores', 'expenses', 'checkins', 'house_rules', 'calendar_events']
-        
-        for table in tables:
-            cursor.execute(f'SELECT * FROM {table}')
-            export_data[table] = [dict_from_row(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        
-        # Create downloadable JSON file
-        output = io.BytesIO()
-        output.write(json.dumps(export_data, indent=2, default=str).encode())
-        output.seek(0)
-        
-        return send_file(
-            output,
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f'roommate_data_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-        )
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    """Export all data, one record per row tagged with its table.
+
+    Emits NDJSON by default; clients sending Accept: application/vnd.msgpack
+    get a msgpack stream instead, which skips number-to-ASCII formatting and
+    is substantially smaller on the wire.
+    """
+    conn = get_db_connection()
+    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    if msgpack is not None and request.accept_mimetypes.best == 'application/vnd.msgpack':
+        def generate():
+            packer = msgpack.Packer()
+            for table, record in _export_rows(conn):
+                yield packer.pack({'_table': table, **record})
+
+        mimetype = 'application/vnd.msgpack'
+        filename = f'roommate_data_export_{ts}.msgpack'
+    else:
+        def generate():
+            # One compact line per row instead of one giant indented
+            # document: memory stays O(batch), the first byte leaves
+            # immediately
+            for table, record in _export_rows(conn):
+                yield orjson.dumps({'_table': table, **record}, default=str) + b'\n'
+
+        mimetype = 'application/x-ndjson'
+        filename = f'roommate_data_export_{ts}.ndjson'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 # ===== ERROR HANDLERS =====
 
 @app.errorhandler(413)
 def too_large(e):
-    return jsonify({'error': 'File too large. Maximum size is 50MB.'}), 413
+    return json_response({'error': 'File too large. Maximum size is 50MB.'}, 413)
 
 @app.errorhandler(404)
 def not_found(e):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return json_response({'error': 'Endpoint not found'}, 404)
 
 @app.errorhandler(500)
 def internal_error(e):
-    return jsonify({'error': 'Internal server error'}), 500
+    return json_response({'error': 'Internal server error'}, 500)
 
 if __name__ == '__main__':
     print("🏠 Starting Roommate Management Backend...")
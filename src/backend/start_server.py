@@ -7,17 +7,25 @@ Run this to start the Flask server with proper initialization
 import os
 import sys
 import subprocess
+from importlib.metadata import distribution, version, PackageNotFoundError
 
 def check_dependencies():
     """Check if required dependencies are installed"""
-    required_packages = ['flask', 'flask-cors', 'pillow', 'requests']
+    required_packages = ['flask', 'flask-cors', 'flask-compress', 'pillow', 'requests', 'orjson', 'gunicorn']
     missing_packages = []
-    
+
+    # Metadata lookup only reads the installed-package records; actually
+    # importing flask & friends just to test presence costs hundreds of ms
     for package in required_packages:
         try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
+            distribution(package)
+        except PackageNotFoundError:
             missing_packages.append(package)
+
+    # The API handlers rely on orjson.Fragment, which arrived in 3.9
+    if 'orjson' not in missing_packages:
+        if tuple(int(part) for part in version('orjson').split('.')[:2]) < (3, 9):
+            missing_packages.append('orjson>=3.9')
     
     if missing_packages:
         print("❌ Missing required packages:")
@@ -51,32 +59,48 @@ def main():
     os.makedirs('uploads/photos', exist_ok=True)
     print("📁 Created upload directories")
     
+    dev_mode = '--dev' in sys.argv
+
     # Start the Flask application
-    print("\n🚀 Starting Flask server...")
+    print(f"\n🚀 Starting {'Werkzeug dev' if dev_mode else 'gunicorn'} server...")
     print("   URL: http://localhost:5000")
     print("   API: http://localhost:5000/api")
     print("   Press Ctrl+C to stop")
     print("=" * 50)
-    
-    try:
-        # Import and run the app
-        from roommate_app import app, init_database
-        
-        # Initialize database
-        print("🗄️  Initializing database...")
-        init_database()
-        print("✅ Database initialized!")
-        
-        # Start the server
-        app.run(debug=True, host='0.0.0.0', port=5000)
-        
-    except ImportError as e:
-        print(f"❌ Error importing roommate_app: {e}")
-        print("Make sure roommate_app.py is in the current directory")
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error starting server: {e}")
-        sys.exit(1)
+
+    if dev_mode:
+        # Single-process debug server with the reloader — development only
+        try:
+            from roommate_app import app, init_database
+
+            # Initialize database
+            print("🗄️  Initializing database...")
+            init_database()
+            print("✅ Database initialized!")
+
+            # Start the server
+            app.run(debug=True, host='0.0.0.0', port=5000)
+
+        except ImportError as e:
+            print(f"❌ Error importing roommate_app: {e}")
+            print("Make sure roommate_app.py is in the current directory")
+            sys.exit(1)
+        except Exception as e:
+            print(f"❌ Error starting server: {e}")
+            sys.exit(1)
+    else:
+        # Preforked workers with threads: requests are served in parallel
+        # across cores, each worker drawing on its own SQLite pool. The
+        # Werkzeug debug server serializes everything and is dev-only.
+        result = subprocess.run([
+            'gunicorn',
+            '-w', '4',
+            '-k', 'gthread',
+            '--threads', '8',
+            '-b', '0.0.0.0:5000',
+            'wsgi:app'
+        ])
+        sys.exit(result.returncode)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers
+Run with e.g.: gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app
+"""
+
+from roommate_app import app
+
+if __name__ == "__main__":
+    app.run()